@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
+import mmap
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import numpy as np
+
 
 def parse(fname: str) -> list[str]:
     """Read from data file. Returns problem specific formatted data."""
@@ -23,56 +27,48 @@ def part1(data: list[str]) -> int:
     return sum(digits)
 
 
-# good god
+def part1_bulk(fname: str) -> int:
+    """Same as part1, but over the raw file bytes in one go (no per-line strings)."""
+    buf = np.frombuffer(Path(fname).read_bytes(), dtype=np.uint8)
+
+    digit_idx = np.flatnonzero((buf >= ord("0")) & (buf <= ord("9")))
+    if not len(digit_idx):
+        return 0
+    values = (buf[digit_idx] - ord("0")).astype(np.int64)
+
+    # which line each digit is on: count the newlines before it
+    lines = np.searchsorted(np.flatnonzero(buf == ord("\n")), digit_idx)
+
+    # digits are in file order, so a line's first/last digits sit where the line id changes
+    boundary = lines[1:] != lines[:-1]
+    first = np.concatenate(([True], boundary))
+    last = np.concatenate((boundary, [True]))
+
+    return int(10 * values[first].sum() + values[last].sum())
+
+
+DIGITS = {
+    word: idx
+    for idx, word in enumerate(
+        ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine"], start=1,
+    )
+} | {str(i): i for i in range(1, 10)}
+
+# built once from the digit vocabulary.
+# the leftmost match is the first digit; the greedy `.*` backtracks from the end of the line, so
+# that pattern lands on the rightmost (possibly overlapping, e.g. "twone") digit without slicing.
+_ALTERNATION = "|".join(sorted(DIGITS, key=len, reverse=True))
+FIRST_DIGIT = re.compile(f"({_ALTERNATION})")
+LAST_DIGIT = re.compile(f".*({_ALTERNATION})")
+
+
 def parse_number(s: str, forward: bool) -> int:
-    if forward:
-        while s:
-            if (s[0] == "1") or s.startswith("one"):
-                return 1
-            if (s[0] == "2") | s.startswith("two"):
-                return 2
-            if (s[0] == "3") | s.startswith("three"):
-                return 3
-            if (s[0] == "4") | s.startswith("four"):
-                return 4
-            if (s[0] == "5") | s.startswith("five"):
-                return 5
-            if (s[0] == "6") | s.startswith("six"):
-                return 6
-            if (s[0] == "7") | s.startswith("seven"):
-                return 7
-            if (s[0] == "8") | s.startswith("eight"):
-                return 8
-            if (s[0] == "9") | s.startswith("nine"):
-                return 9
-
-            s = s[1:]
-
-    else:
-        while s:
-            if (s[-1] == "1") or s.endswith("one"):
-                return 1
-            if (s[-1] == "2") | s.endswith("two"):
-                return 2
-            if (s[-1] == "3") | s.endswith("three"):
-                return 3
-            if (s[-1] == "4") | s.endswith("four"):
-                return 4
-            if (s[-1] == "5") | s.endswith("five"):
-                return 5
-            if (s[-1] == "6") | s.endswith("six"):
-                return 6
-            if (s[-1] == "7") | s.endswith("seven"):
-                return 7
-            if (s[-1] == "8") | s.endswith("eight"):
-                return 8
-            if (s[-1] == "9") | s.endswith("nine"):
-                return 9
-
-            s = s[:-1]
-
-    emsg = "unreachable"
-    raise ValueError(emsg)
+    m = (FIRST_DIGIT.search if forward else LAST_DIGIT.match)(s)
+    if m is None:
+        emsg = "unreachable"
+        raise ValueError(emsg)
+
+    return DIGITS[m.group(1)]
 
 
 def part2(data: list[str]) -> int:
@@ -84,6 +80,47 @@ def part2(data: list[str]) -> int:
     return sum(digits)
 
 
+CHUNK_SIZE = 64 * 1024 * 1024
+
+
+def chunk_bounds(fname: str, chunk_size: int = CHUNK_SIZE) -> list[tuple[int, int]]:
+    """Split a file into (start, stop) byte offsets of roughly chunk_size, ending on newlines."""
+    with Path(fname).open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        bounds = []
+        start = 0
+        while start < len(mm):
+            stop = mm.find(b"\n", min(start + chunk_size, len(mm)) - 1)
+            stop = len(mm) if stop == -1 else stop + 1
+            bounds.append((start, stop))
+            start = stop
+
+    return bounds
+
+
+def calibrate_chunk(fname: str, start: int, stop: int) -> tuple[int, int]:
+    """Sum both parts over the lines of a single chunk."""
+    with Path(fname).open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        lines = [line.strip() for line in mm[start:stop].decode().splitlines() if line.strip()]
+
+    if not lines:
+        return 0, 0
+    return part1(lines), part2(lines)
+
+
+def calibrate_parallel(
+    fname: str, workers: int | None = None, chunk_size: int = CHUNK_SIZE,
+) -> tuple[int, int]:
+    """Both parts over a (huge) file, one memory-mapped chunk per task in a process pool."""
+    if Path(fname).stat().st_size == 0:
+        return 0, 0
+
+    starts, stops = zip(*chunk_bounds(fname, chunk_size), strict=True)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        sums = list(pool.map(calibrate_chunk, [fname] * len(starts), starts, stops))
+
+    return sum(p1 for p1, _ in sums), sum(p2 for _, p2 in sums)
+
+
 if __name__ == "__main__":
     data = parse(sys.argv[1])
 
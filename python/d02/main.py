@@ -4,70 +4,259 @@ from __future__ import annotations
 
 # commonly-used built-in imports. not all of these are necessarily used each day.
 import functools
+import math
+import re
 import sys
+from array import array
 from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import numpy.typing as npt
 
 # see parent directory
 # from aoc_tools import *
 
 
-class Set:
-    red: int = 0
-    blue: int = 0
-    green: int = 0
+# part 1 bag: red, green, blue
+LIMITS = (12, 13, 14)
+
+# one pass over the line: the game id, then each "<n> <colour>", with ";" closing a draw
+TOKENS = re.compile(r"Game (\d+)|(\d+) (red|green|blue)|(;)")
 
 
 class Game:
+    # each draw is one index across the three colour arrays
+    __slots__ = ("blue", "game_id", "green", "red")
+
     def __init__(self, s: str):
-        game_id, sets = s.split(": ")
-
-        self.game_id = int(game_id.split(" ")[-1])
-        self.sets = []
-        for set_ in sets.split("; "):
-            # red, blue, green
-            set_q = Set()
-            for c in set_.split(", "):
-                i, col = c.split(" ")
-                if col == "red":
-                    set_q.red = int(i)
-                if col == "blue":
-                    set_q.blue = int(i)
-                if col == "green":
-                    set_q.green = int(i)
-            self.sets.append(set_q)
-
-    def possible(self) -> bool:
-        return all(
-            s.red <= 12 and s.blue <= 14 and s.green <= 13
-            for s in self.sets
-        )
+        self.game_id = 0
+        self.red = array("H", [0])
+        self.green = array("H", [0])
+        self.blue = array("H", [0])
+
+        for m in TOKENS.finditer(s):
+            game_id, count, col, end_draw = m.groups()
+            if game_id:
+                self.game_id = int(game_id)
+            elif end_draw:
+                self.red.append(0)
+                self.green.append(0)
+                self.blue.append(0)
+            else:
+                getattr(self, col)[-1] = int(count)
+
+    def possible(self, limits: tuple[int, int, int] = LIMITS) -> bool:
+        red, green, blue = limits
+        return max(self.red) <= red and max(self.green) <= green and max(self.blue) <= blue
 
     def find_fewest(self) -> tuple[int, int, int]:
-        # return: red, blue, green
-        return (
-            max(s.red for s in self.sets),
-            max(s.green for s in self.sets),
-            max(s.blue for s in self.sets),
-        )
+        # return: red, green, blue
+        return max(self.red), max(self.green), max(self.blue)
 
     def power_set(self) -> int:
         return functools.reduce(lambda x, y: x * y, self.find_fewest(), 1)
 
 
-def parse(fname: str) -> list[str]:
+def parse(fname: str) -> list[Game]:
     """Read from data file. Returns problem specific formatted data."""
     with Path(fname).open() as f:
-        return [line.strip() for line in f.read().splitlines() if line.strip()]
+        return [Game(line) for line in f if line.strip()]
+
+
+def part1(data: list[Game]) -> int:
+    return sum(g.game_id for g in filter(lambda g: g.possible(), data))
+
+
+def part2(data: list[Game]) -> int:
+    return sum(g.power_set() for g in data)
+
+
+def solve_stream(fname: str) -> tuple[int, int]:
+    """Both parts in a single read of the file, holding only the current game."""
+    possible_ids = 0
+    powers = 0
+    with Path(fname).open() as f:
+        for line in f:
+            if not line.strip():
+                continue
+            game = Game(line)
+            if game.possible():
+                possible_ids += game.game_id
+            powers += game.power_set()
+
+    return possible_ids, powers
+
+
+# columnar backend: every draw of every game in one array, no per-game objects.
+COLUMNS = {"red": 0, "green": 1, "blue": 2}
+
+
+class Draws(NamedTuple):
+    game_ids: npt.NDArray[np.int64]
+    # (n_draws, 3): red, green, blue
+    draws: npt.NDArray[np.int64]
+    # index of each game's first row in `draws`
+    offsets: npt.NDArray[np.int64]
+
+    def maxima(self) -> npt.NDArray[np.int64]:
+        """(n_games, 3) fewest cubes of each colour per game."""
+        return np.maximum.reduceat(self.draws, self.offsets, axis=0)
+
+
+def parse_columnar(fname: str) -> Draws:
+    game_ids: list[int] = []
+    offsets: list[int] = []
+    flat: list[int] = []
+
+    for game_id, count, col, end_draw in TOKENS.findall(Path(fname).read_text()):
+        if game_id:
+            game_ids.append(int(game_id))
+            offsets.append(len(flat) // 3)
+            flat.extend((0, 0, 0))
+        elif end_draw:
+            flat.extend((0, 0, 0))
+        else:
+            flat[len(flat) - 3 + COLUMNS[col]] = int(count)
+
+    return Draws(
+        game_ids = np.array(game_ids, dtype=np.int64),
+        draws = np.array(flat, dtype=np.int64).reshape(-1, 3),
+        offsets = np.array(offsets, dtype=np.int64),
+    )
+
+
+# largest prefix-sum table BagIndex will allocate (int64 cells, so 32MB)
+MAX_TABLE_CELLS = 2**22
+# below this many queries, building the 2d fenwick tree costs more than scanning for each one
+SWEEP_MIN_QUERIES = 1024
+
+
+class BagIndex:
+    """Answer many (red, green, blue) bag-limit queries against the same games.
+
+    Per-game maxima are computed once and the game ids are accumulated into a 3d prefix-sum table
+    over the (compressed) distinct maxima of each colour: cell [r, g, b] holds the id sum of every
+    game dominated by that point. A query is then a searchsorted per colour and one lookup.
+
+    That table grows with the cube of the number of distinct maxima. Past MAX_TABLE_CELLS, single
+    queries are a vectorized scan over the maxima instead, and large query_many batches sweep the
+    games (sorted on the colour with the most distinct maxima) into a 2d fenwick tree over the
+    other two colours, answering the queries offline in O(log^2) each.
+    """
+
+    def __init__(self, game_ids: npt.NDArray[np.int64], maxima: npt.NDArray[np.int64]):
+        self.game_ids = game_ids
+        self.maxima = maxima
+        self.values = [np.unique(maxima[:, col]) for col in range(3)]
+
+        shape = tuple(len(v) for v in self.values)
+        self.table: npt.NDArray[np.int64] | None = None
+        if math.prod(shape) <= MAX_TABLE_CELLS:
+            coords = tuple(
+                np.searchsorted(self.values[col], maxima[:, col]) for col in range(3)
+            )
+            table = np.zeros(shape, dtype=np.int64)
+            np.add.at(table, coords, game_ids)
+            for axis in range(3):
+                np.cumsum(table, axis=axis, out=table)
+            self.table = table
+
+        # sweep along the colour with the most distinct maxima, the fenwick tree gets the others
+        self.sweep = max(range(3), key=lambda col: shape[col])
+        self.rows, self.cols = (col for col in range(3) if col != self.sweep)
+        self.can_sweep = (shape[self.rows] + 1) * (shape[self.cols] + 1) <= MAX_TABLE_CELLS
+
+    @classmethod
+    def from_draws(cls, data: Draws) -> BagIndex:
+        return cls(data.game_ids, data.maxima())
+
+    @classmethod
+    def from_games(cls, games: list[Game]) -> BagIndex:
+        return cls(
+            np.array([g.game_id for g in games], dtype=np.int64),
+            np.array([g.find_fewest() for g in games], dtype=np.int64).reshape(-1, 3),
+        )
+
+    def _count(self, col: int, limit: int) -> int:
+        """How many distinct maxima of this colour fit under the limit."""
+        return int(np.searchsorted(self.values[col], limit, side="right"))
+
+    def query(self, red: int, green: int, blue: int) -> int:
+        """Sum of ids of the games possible with this many cubes in the bag."""
+        if self.table is None:
+            possible = (self.maxima <= (red, green, blue)).all(axis=1)
+            return int(self.game_ids[possible].sum())
+
+        idx = [
+            self._count(col, limit) - 1 for col, limit in enumerate((red, green, blue))
+        ]
+        if min(idx) < 0:
+            return 0
+        return int(self.table[tuple(idx)])
+
+    def query_many(self, queries: list[tuple[int, int, int]]) -> list[int]:
+        """query() for a batch of (red, green, blue) limits."""
+        if self.table is not None or not self.can_sweep or len(queries) < SWEEP_MIN_QUERIES:
+            return [self.query(*q) for q in queries]
+
+        order = np.argsort(self.maxima[:, self.sweep], kind="stable")
+        sorted_sweep = self.maxima[order, self.sweep].tolist()
+        sorted_games = list(zip(
+            np.searchsorted(self.values[self.rows], self.maxima[order, self.rows]).tolist(),
+            np.searchsorted(self.values[self.cols], self.maxima[order, self.cols]).tolist(),
+            self.game_ids[order].tolist(),
+            strict=True,
+        ))
+
+        width = len(self.values[self.cols]) + 1
+        tree = [0] * ((len(self.values[self.rows]) + 1) * width)
+
+        def add(row: int, col: int, game_id: int) -> None:
+            i = row + 1
+            while i * width < len(tree):
+                j = col + 1
+                while j < width:
+                    tree[i * width + j] += game_id
+                    j += j & -j
+                i += i & -i
+
+        def prefix(rows: int, cols: int) -> int:
+            total = 0
+            i = rows
+            while i > 0:
+                j = cols
+                while j > 0:
+                    total += tree[i * width + j]
+                    j -= j & -j
+                i -= i & -i
+            return total
+
+        answers = [0] * len(queries)
+        inserted = 0
+        for q in sorted(range(len(queries)), key=lambda q: queries[q][self.sweep]):
+            limits = queries[q]
+            while (
+                inserted < len(sorted_games)
+                and sorted_sweep[inserted] <= limits[self.sweep]
+            ):
+                add(*sorted_games[inserted])
+                inserted += 1
+            answers[q] = prefix(
+                self._count(self.rows, limits[self.rows]),
+                self._count(self.cols, limits[self.cols]),
+            )
+
+        return answers
 
 
-def part1(data: list[str]) -> int:
-    games = list(map(Game, data))
-    return sum(g.game_id for g in filter(lambda g: g.possible(), games))
+def part1_columnar(data: Draws) -> int:
+    possible = (data.maxima() <= LIMITS).all(axis=1)
+    return int(data.game_ids[possible].sum())
 
 
-def part2(data: list[str]) -> int:
-    games = map(Game, data)
-    return sum(g.power_set() for g in games)
+def part2_columnar(data: Draws) -> int:
+    return int(data.maxima().prod(axis=1).sum())
 
 
 if __name__ == "__main__":
@@ -1,8 +1,16 @@
 #! /usr/bin/env python3
 
+from __future__ import annotations
+
+import re
 import sys
+from collections import deque
+from pathlib import Path
 from typing import Generator, NamedTuple
 
+import numpy as np
+import numpy.typing as npt
+
 
 class Point(NamedTuple):
     x: int
@@ -15,15 +23,23 @@ def parse(fname: str, strict=False):
 
     numbers = []
     grid = set()
+    # cell -> index into `numbers` of the number covering it
+    labels: dict[Point, int] = {}
+
+    def add_number(end: Point, n: str) -> None:
+        for dx in range(len(n)):
+            labels[Point(end.x - dx, end.y)] = len(numbers)
+        numbers.append((end, int(n)))
+
     for y, line in enumerate(lines):
         n = ""
         for x, c in enumerate(line.strip()):
             if n and not c.isdigit():
                 # yeah ... sorry :(
-                numbers.append((Point(x-1, y), int(n)))
+                add_number(Point(x-1, y), n)
                 n = ""
                 if c != ".":
-                    if strict:
+                    if not strict:
                         grid.add(Point(x, y))
                     else:
                         if c == "*":
@@ -44,14 +60,14 @@ def parse(fname: str, strict=False):
 
         if n:
             # assumes x is not unbound
-            numbers.append((Point(x, y), int(n)))
+            add_number(Point(x, y), n)
             n = ""
 
-    return grid, numbers
+    return grid, numbers, labels
 
 
 def part1(fname: str) -> int:
-    grid, numbers = parse(fname)
+    grid, numbers, _ = parse(fname)
 
     def is_adj(n_len: int, point: Point) -> bool:
         points_around = set(
@@ -77,28 +93,168 @@ def part1(fname: str) -> int:
 
 
 def part2(fname: str) -> int:
-    grid, numbers = parse(fname, strict=True)
+    grid, numbers, labels = parse(fname, strict=True)
 
-    def adj(n_len: int, point: Point) -> Generator[Point, None, None]:
-        points_around = set(
-                Point(x, y)
-                for x in range(point.x - n_len, point.x + 2)
-                for y in range(point.y - 1, point.y + 2)
-                )
+    total = 0
+    for gear in grid:
+        adjacent = {
+            labels[p]
+            for dx in (-1, 0, 1)
+            for dy in (-1, 0, 1)
+            if (p := Point(gear.x + dx, gear.y + dy)) in labels
+        }
+        if len(adjacent) == 2:
+            n1, n2 = adjacent
+            total += numbers[n1][1] * numbers[n2][1]
 
-        yield from points_around.intersection(grid)
+    return total
 
-    grid_count = {}
-    for p, num in numbers:
-        for gear in adj(len(str(num)), p):
-            if gear not in grid_count:
-                grid_count[gear] = (1, 0)
-            ratio, parts = grid_count[gear]
-            ratio *= num
-            parts += 1
-            grid_count[gear] = (ratio, parts)
-
-    return sum(gear_info[0] for gear_info in grid_count.values() if gear_info[1] == 2)
+
+# streaming mode: adjacency only ever spans three rows, so keep just those around
+
+NUMBER = re.compile(r"\d+")
+
+
+class Row(NamedTuple):
+    line: str
+    # (start, stop, value) for each number, stop exclusive
+    numbers: list[tuple[int, int, int]]
+
+    @classmethod
+    def from_line(cls, line: str) -> Row:
+        return Row(line, [(m.start(), m.end(), int(m.group())) for m in NUMBER.finditer(line)])
+
+
+def scan_window(window: deque[Row]) -> tuple[list[int], list[int]]:
+    """Part numbers and gear ratios of the middle row of a (previous, current, next) window."""
+    _, cur, _ = window
+
+    parts = [
+        value
+        for start, stop, value in cur.numbers
+        if any(
+            not c.isdigit() and c != "."
+            for row in window
+            for c in row.line[max(start - 1, 0):stop + 1]
+        )
+    ]
+
+    ratios = []
+    for x, c in enumerate(cur.line):
+        if c != "*":
+            continue
+        adjacent = [
+            value
+            for row in window
+            for start, stop, value in row.numbers
+            if start - 1 <= x <= stop
+        ]
+        if len(adjacent) == 2:
+            ratios.append(adjacent[0] * adjacent[1])
+
+    return parts, ratios
+
+
+def scan_rows(fname: str) -> Generator[tuple[list[int], list[int]], None, None]:
+    """Yield (part numbers, gear ratios) for each row once its next row has been read."""
+    empty = Row("", [])
+    window: deque[Row] = deque([empty, empty], maxlen=3)
+
+    with Path(fname).open() as f:
+        for line in f:
+            if not line.strip():
+                continue
+            window.append(Row.from_line(line.strip()))
+            if window[1] is not empty:
+                yield scan_window(window)
+
+    window.append(empty)
+    if window[1] is not empty:
+        yield scan_window(window)
+
+
+def solve_stream(fname: str) -> tuple[int, int]:
+    p1 = 0
+    p2 = 0
+    for parts, ratios in scan_rows(fname):
+        p1 += sum(parts)
+        p2 += sum(ratios)
+
+    return p1, p2
+
+
+# numpy mode: the whole schematic as one byte grid
+
+NEIGHBORHOOD = [(dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1)]
+
+
+def parse_array(fname: str) -> npt.NDArray[np.uint8]:
+    lines = Path(fname).read_bytes().split()
+
+    return np.frombuffer(b"".join(lines), dtype=np.uint8).reshape(len(lines), -1)
+
+
+def shifted(grid: npt.NDArray, fill: int = 0) -> Generator[npt.NDArray, None, None]:
+    """Yield the grid as seen from each of the 9 cells of a 3x3 neighborhood."""
+    h, w = grid.shape
+    padded = np.pad(grid, 1, constant_values=fill)
+    for dy, dx in NEIGHBORHOOD:
+        yield padded[1 + dy : 1 + dy + h, 1 + dx : 1 + dx + w]
+
+
+def label_numbers(
+    grid: npt.NDArray[np.uint8],
+) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    """Label each run of digits.
+
+    Returns a grid of labels (0 where there is no digit, runs numbered from 1) and the value of
+    each label (index 0 is a placeholder).
+    """
+    digits = (grid >= ord("0")) & (grid <= ord("9"))
+
+    # an extra blank column so runs can't wrap onto the next row once flattened
+    flat = np.pad(digits, ((0, 0), (0, 1))).ravel()
+    starts = flat & ~np.concatenate(([False], flat[:-1]))
+    labels = np.cumsum(starts) * flat
+
+    idx = np.flatnonzero(flat)
+    run_labels = labels[idx]
+    # place value of each digit: distance to the end of its run
+    ends = np.zeros(run_labels.max(initial=0) + 1, dtype=np.int64)
+    np.maximum.at(ends, run_labels, idx)
+    place = np.power(10, ends[run_labels] - idx, dtype=np.int64)
+
+    values = np.zeros_like(ends)
+    padded = np.pad(grid, ((0, 0), (0, 1))).ravel()
+    np.add.at(values, run_labels, (padded[idx].astype(np.int64) - ord("0")) * place)
+
+    return labels.reshape(digits.shape[0], -1)[:, :-1], values
+
+
+def part1_array(grid: npt.NDArray[np.uint8]) -> int:
+    digits = (grid >= ord("0")) & (grid <= ord("9"))
+    symbols = ~digits & (grid != ord("."))
+    near_symbol = np.logical_or.reduce(list(shifted(symbols, fill=False)))
+
+    labels, values = label_numbers(grid)
+    is_part = np.zeros(len(values), dtype=bool)
+    is_part[labels[near_symbol & digits]] = True
+
+    return int(values[is_part].sum())
+
+
+def part2_array(grid: npt.NDArray[np.uint8]) -> int:
+    labels, values = label_numbers(grid)
+    gears = grid == ord("*")
+
+    # (n_stars, 9) labels around each star, sorted so duplicates are adjacent
+    around = np.sort(np.stack([s[gears] for s in shifted(labels)], axis=1), axis=1)
+    distinct = np.ones_like(around, dtype=bool)
+    distinct[:, 1:] = around[:, 1:] != around[:, :-1]
+    distinct &= around != 0
+
+    ratios = np.where(distinct, values[around], 1).prod(axis=1)
+    return int(ratios[distinct.sum(axis=1) == 2].sum())
 
 
 if __name__ == "__main__":
@@ -4,41 +4,51 @@ from __future__ import annotations
 
 # commonly-used built-in imports. not all of these are necessarily used each day.
 import sys
-from collections import Counter
+import typing
+from collections import deque
 from pathlib import Path
 from typing import NamedTuple
 
+import numpy as np
+import numpy.typing as npt
+
+
+def to_mask(numbers: str) -> int:
+    """Numbers are all below 100, so a set of them fits in a single int bitmask."""
+    mask = 0
+    for n in numbers.split():
+        mask |= 1 << int(n)
+    return mask
+
+
+def from_mask(mask: int) -> list[int]:
+    return [n for n in range(mask.bit_length()) if mask >> n & 1]
+
 
 class Card(NamedTuple):
     card_id: int
-    winning: set[int]
-    obtained: list[int]
+    winning: int
+    obtained: int
 
     @classmethod
     def from_line(cls, line: str) -> Card:
         card, numbers = line.split(": ")
+        winning, obtained = numbers.split("|")
         return Card(
             card_id = int(card.split(" ")[-1]),
-            winning = set([int(n) for n in numbers.split("|")[0].split(" ") if n]),
-            obtained = [int(n) for n in numbers.split("|")[1].split(" ") if n],
+            winning = to_mask(winning),
+            obtained = to_mask(obtained),
         )
 
     def score(self) -> int:
-        score = None
-        for n in self.obtained:
-            if n in self.winning:
-                if not score:
-                    score = 1
-                else:
-                    score *= 2
-
-        return score or 0
+        matches = self.copy_score()
+        return 1 << (matches - 1) if matches else 0
 
     def copy_score(self) -> int:
-        return sum([n in self.winning for n in self.obtained])
+        return (self.winning & self.obtained).bit_count()
 
     def __repr__(self) -> str:
-        return f"{self.card_id}: {self.winning} | {self.obtained}"
+        return f"{self.card_id}: {from_mask(self.winning)} | {from_mask(self.obtained)}"
 
 
 def parse(fname: str) -> list[Card]:
@@ -55,20 +65,88 @@ def part1(data: list[Card]) -> int:
     return sum(map(lambda card: card.score(), data))
 
 
+def count_copies(matches: typing.Iterable[int]) -> int:
+    """Total cards (originals and copies) given each card's match count, in deck order.
+
+    Difference array over card indices: a card adds its copy count to the next `matches` cards,
+    recorded as +count at the start of that range and -count just past the end. Only the entries
+    for upcoming cards are kept, in a deque no longer than the largest match count (plus one),
+    so `matches` can be a stream of any length.
+    """
+    pending: deque[int] = deque()
+
+    copies = 0
+    total = 0
+    for m in matches:
+        copies += pending.popleft() if pending else 0
+        count = copies + 1  # add the original card
+        total += count
+
+        if m:
+            # pending[i] now belongs to the card i + 1 places further on
+            pending.extend([0] * (m + 1 - len(pending)))
+            pending[0] += count
+            pending[m] -= count
+
+    return total
+
+
 def part2(data: list[Card]) -> int:
-    copies: Counter[int] = Counter()
+    return count_copies([card.copy_score() for card in data])
+
+
+def part2_stream(fname: str) -> int:
+    """part2, reading one card at a time."""
+    with Path(fname).open() as f:
+        return count_copies(
+            Card.from_line(line.strip()).copy_score() for line in f if line.strip()
+        )
+
+
+# numpy mode: every card as a row of a (n_cards, 100) presence matrix
+
+
+def parse_matrix(fname: str) -> tuple[npt.NDArray[np.bool_], npt.NDArray[np.bool_]]:
+    """Winning and obtained presence matrices, read straight from the file bytes.
+
+    Relies on the input layout: every line has the same width and each number is a right-aligned
+    two-character field preceded by a space (" 41", "  6").
+    """
+    raw = Path(fname).read_bytes().rstrip(b"\n") + b"\n"
+    width = raw.index(b"\n") + 1
+    rows = np.frombuffer(raw, dtype=np.uint8).reshape(-1, width)[:, :-1]
+
+    colon = raw.index(b":")
+    pipe = raw.index(b"|")
+
+    def presence(fields: npt.NDArray[np.uint8]) -> npt.NDArray[np.bool_]:
+        digits = fields.reshape(len(rows), -1, 3)[:, :, 1:].astype(np.int64) - ord("0")
+        digits[digits < 0] = 0  # leading space
+        numbers = digits[:, :, 0] * 10 + digits[:, :, 1]
+
+        matrix = np.zeros((len(rows), 100), dtype=bool)
+        matrix[np.arange(len(rows))[:, None], numbers] = True
+        return matrix
+
+    return presence(rows[:, colon + 1:pipe - 1]), presence(rows[:, pipe + 1:])
+
+
+def matches_matrix(
+    data: tuple[npt.NDArray[np.bool_], npt.NDArray[np.bool_]],
+) -> npt.NDArray[np.int64]:
+    winning, obtained = data
+    return (winning & obtained).sum(axis=1)
+
 
-    last_card_id = data[-1].card_id
+def part1_matrix(data: tuple[npt.NDArray[np.bool_], npt.NDArray[np.bool_]]) -> int:
+    matches = matches_matrix(data)
+    scores = np.where(matches > 0, np.left_shift(1, np.maximum(matches - 1, 0)), 0)
+    return int(scores.sum())
 
-    for card in data:
-        copies[card.card_id] += 1  # add the original card
-        mult = copies[card.card_id]
-        for c in range(
-            card.card_id + 1, min(last_card_id + 1, card.card_id + 1 + card.copy_score()),
-        ):
-            copies[c] += mult
 
-    return copies.total()
+def part2_matrix(data: tuple[npt.NDArray[np.bool_], npt.NDArray[np.bool_]]) -> int:
+    # copy counts grow past 64 bits quickly, so the propagation itself stays in python ints
+    return count_copies(matches_matrix(data).tolist())
 
 
 if __name__ == "__main__":
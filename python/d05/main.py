@@ -3,11 +3,18 @@
 from __future__ import annotations
 
 # commonly-used built-in imports. not all of these are necessarily used each day.
+import bisect
+import functools
+import heapq
+import itertools
 import sys
 import typing
 from pathlib import Path
 from pprint import pprint
 
+import numpy as np
+import numpy.typing as npt
+
 # see parent directory
 # from aoc_tools import *
 
@@ -18,13 +25,62 @@ class Interval(typing.NamedTuple):
     range_: int
 
 
-def parse_lazy(fname: str) -> tuple[list[int], list[set[Interval]]]:
+class Table:
+    """One transform layer, as parallel arrays sorted by source start for bisect lookups.
+
+    Also indexed by destination start for the reverse direction. Iterating yields the intervals
+    in source order.
+    """
+
+    def __init__(self, intervals: typing.Iterable[Interval]):
+        self.intervals = sorted(intervals, key=lambda t: t.src)
+        self.starts = [t.src for t in self.intervals]
+        self.stops = [t.src + t.range_ for t in self.intervals]
+        self.offsets = [t.dst - t.src for t in self.intervals]
+
+        by_dst = sorted(self.intervals, key=lambda t: t.dst)
+        self.dst_starts = [t.dst for t in by_dst]
+        self.dst_stops = [t.dst + t.range_ for t in by_dst]
+        self.dst_offsets = [t.dst - t.src for t in by_dst]
+
+    def __iter__(self) -> typing.Iterator[Interval]:
+        return iter(self.intervals)
+
+    def __len__(self) -> int:
+        return len(self.intervals)
+
+    def forward(self, s: int) -> int:
+        idx = bisect.bisect_right(self.starts, s) - 1
+        if idx >= 0 and s < self.stops[idx]:
+            return s + self.offsets[idx]
+        return s
+
+    def backward(self, loc: int) -> int:
+        idx = bisect.bisect_right(self.dst_starts, loc) - 1
+        if idx >= 0 and loc < self.dst_stops[idx]:
+            return loc - self.dst_offsets[idx]
+        return loc
+
+
+class Layers(list[Table]):
+    """The parsed transform layers, owning their composed Almanac.
+
+    The Almanac is built on first use and kept with the layers, so lookups through the same
+    parse share it; plain lists of tables are walked layer by layer instead.
+    """
+
+    @functools.cached_property
+    def almanac(self) -> Almanac:
+        return Almanac(self)
+
+
+def parse_lazy(fname: str) -> tuple[list[int], Layers]:
     with Path(fname).open() as f:
         chunks = f.read().split("\n\n")
 
     seeds = list(map(int, chunks[0].split(": ")[1].split(" ")))
 
-    transforms = []
+    transforms = Layers()
 
     for chunk in chunks[1:]:
         transform = set()
@@ -33,47 +89,64 @@ def parse_lazy(fname: str) -> tuple[list[int], list[set[Interval]]]:
                 continue
             dst, src, r = list(map(int, line.split(" ")))
             transform.add(Interval(dst, src, r))
-        transforms.append(transform)
+        transforms.append(Table(transform))
 
     return seeds, transforms
 
 
-def calc_seed(s: int, transforms: list[set[Interval]]) -> int:
-    for chunk in transforms:
+def calc_seed(s: int, transforms: list[Table]) -> int:
+    if isinstance(transforms, Layers):
+        return transforms.almanac.location(s)
 
-        for chunk_t in chunk:
-            if s in range(chunk_t.src, chunk_t.src + chunk_t.range_):
-                # print(f"Found {s} in chunk: {chunk_t}")
-                s = (s - chunk_t.src) + chunk_t.dst
-                break
+    for chunk in transforms:
+        s = chunk.forward(s)
 
     return s
 
 
-def part1(data: tuple[list[int], list[set[Interval]]]) -> int:
+def calc_seeds(seeds: npt.NDArray[np.int64], transforms: list[Table]) -> npt.NDArray[np.int64]:
+    """calc_seed over a whole array of seeds at once."""
+    if isinstance(transforms, Layers):
+        return transforms.almanac.locations(seeds)
+
+    locs = np.asarray(seeds, dtype=np.int64)
+    for chunk in transforms:
+        if not len(chunk):
+            continue
+        starts = np.array(chunk.starts, dtype=np.int64)
+        stops = np.array(chunk.stops, dtype=np.int64)
+        offsets = np.array(chunk.offsets, dtype=np.int64)
+
+        idx = np.searchsorted(starts, locs, side="right") - 1
+        clipped = np.maximum(idx, 0)
+        inside = (idx >= 0) & (locs < stops[clipped])
+        locs = locs + np.where(inside, offsets[clipped], 0)
+
+    return locs
+
+
+def part1_batch(data: tuple[list[int], list[Table]]) -> int:
     seeds, transforms = data
-    return min(calc_seed(s, transforms) for s in seeds)
+    return int(calc_seeds(np.array(seeds, dtype=np.int64), transforms).min())
 
 
-def reverse_search(seed_ranges: Disjoint, transforms: list[set[Interval]]) -> int:
+def part1(data: tuple[list[int], list[Table]]) -> int:
+    seeds, transforms = data
+
+    # each seed is just a span of one
+    seed_ranges = Disjoint()
+    for s in seeds:
+        seed_ranges.update(s, 1)
+
+    return lowest_location(seed_ranges, transforms)
+
+
+def reverse_search(seed_ranges: Disjoint, transforms: list[Table]) -> int:
     def search_loc(i: int) -> bool:
-        queue = set([i])
         for chunk in transforms[::-1]:
-            new_queue = set()
-            while queue:
-                loc = queue.pop()
-                found = False
-                for chunk_t in chunk:
-                    s = loc - chunk_t.dst + chunk_t.src
-                    if s >= 0 and s in range(chunk_t.src, chunk_t.src + chunk_t.range_):
-                        found = True
-                        new_queue.add(s)
-                        break
-                if not found:
-                    new_queue.add(loc)
-            queue = new_queue
-
-        return bool(queue) and any(s in seed_ranges for s in queue)
+            i = chunk.backward(i)
+
+        return i in seed_ranges
 
     loc = 0
     while True:
@@ -85,40 +158,201 @@ def reverse_search(seed_ranges: Disjoint, transforms: list[set[Interval]]) -> in
 
 
 class Disjoint:
+    """Sorted, coalesced set of half-open [start, stop) spans."""
+
     def __init__(self):
-        self.ranges = []
+        self.starts: list[int] = []
+        self.stops: list[int] = []
 
     def update(self, start: int, range_: int) -> None:
-        stop = start + range_ - 1
-
-        if not self.ranges:
-            self.ranges.append((start, stop))
+        stop = start + range_
+        if range_ <= 0:
             return
 
-        for idx in range(len(self.ranges)):
-            if (self.ranges[idx][0] <= stop <= self.ranges[idx][1]) or (
-                self.ranges[idx][0] <= start <= self.ranges[idx][1]
-            ):
-                # if stop >= self.ranges[idx][0] or start <= self.ranges[idx][1]:
-                nstart, nstop = self.ranges.pop(idx)
-                min_start = min(start, nstart)
-                max_stop = max(stop, nstop)
-                max_range = max_stop - min_start + 1
-                self.update(min_start, max_range)
-                return
+        # every existing span overlapping (or touching) [start, stop) gets merged into it
+        lo = bisect.bisect_left(self.stops, start)
+        hi = bisect.bisect_right(self.starts, stop)
+        if lo < hi:
+            start = min(start, self.starts[lo])
+            stop = max(stop, self.stops[hi - 1])
 
-        self.ranges.append((start, start + range_ - 1))
+        self.starts[lo:hi] = [start]
+        self.stops[lo:hi] = [stop]
 
-    def __iter__(self):
-        for start, stop in self.ranges:
-            yield from range(start, stop + 1)
+    def __iter__(self) -> typing.Iterator[tuple[int, int]]:
+        yield from zip(self.starts, self.stops, strict=True)
+
+    def __len__(self) -> int:
+        return len(self.starts)
 
     def __contains__(self, s: int) -> bool:
-        return any(s in range(start, stop + 1) for start, stop in self.ranges)
+        idx = bisect.bisect_right(self.starts, s) - 1
+        return idx >= 0 and s < self.stops[idx]
+
+
+def split_span(start: int, stop: int, chunk: Table) -> list[tuple[int, int, int]]:
+    """Split a half-open [start, stop) span at the interval boundaries of one transform layer.
+
+    Returns (start, stop, offset) pieces covering the span in order, where offset is what that
+    layer adds to every value in the piece. Walks the sorted table from the first interval that
+    could overlap, so only the intervals actually touching the span are visited.
+    """
+    pieces = []
+
+    # first interval that could overlap: the last one starting at or before `start`, unless it
+    # already ended
+    idx = max(bisect.bisect_right(chunk.starts, start) - 1, 0)
+    if idx < len(chunk) and chunk.stops[idx] <= start:
+        idx += 1
+
+    while start < stop:
+        if idx < len(chunk) and chunk.starts[idx] < stop:
+            if start < chunk.starts[idx]:
+                # gap before the next interval maps to itself
+                pieces.append((start, chunk.starts[idx], 0))
+                start = chunk.starts[idx]
+            hi = min(stop, chunk.stops[idx])
+            pieces.append((start, hi, chunk.offsets[idx]))
+            start = hi
+            idx += 1
+        else:
+            pieces.append((start, stop, 0))
+            start = stop
+
+    return pieces
+
+
+def map_ranges(spans: list[tuple[int, int]], chunk: Table) -> list[tuple[int, int]]:
+    """Push half-open [start, stop) spans through one transform layer."""
+    return [
+        (lo + offset, hi + offset)
+        for start, stop in spans
+        for lo, hi, offset in split_span(start, stop, chunk)
+    ]
+
+
+class Almanac:
+    """All the transform layers composed into one piecewise-linear seed -> location map.
+
+    Seeds in [starts[i], stops[i]) map to seed + offsets[i]. Every interval lies below `bound`, so
+    anything outside [0, bound) passes through each layer unchanged.
+    """
+
+    def __init__(self, transforms: list[Table]):
+        self.bound = max(
+            (t.src + t.range_ for chunk in transforms for t in chunk), default=0,
+        )
+
+        pieces = [(0, self.bound, 0)] if self.bound else []
+        for chunk in transforms:
+            pieces = [
+                (lo - offset, hi - offset, offset + shift)
+                for start, stop, offset in pieces
+                for lo, hi, shift in split_span(start + offset, stop + offset, chunk)
+            ]
+        pieces.sort()
+
+        self.starts = [p[0] for p in pieces]
+        self.stops = [p[1] for p in pieces]
+        self.offsets = [p[2] for p in pieces]
+
+        self.np_starts = np.array(self.starts, dtype=np.int64)
+        self.np_stops = np.array(self.stops, dtype=np.int64)
+        self.np_offsets = np.array(self.offsets, dtype=np.int64)
+
+        self.pieces = pieces
+
+    @functools.cached_property
+    def inverse(self) -> tuple[list[int], list[int], list[int]]:
+        """(starts, stops, offsets) of the location -> smallest seed map, built on first use.
+
+        Images of different pieces can overlap (two seeds landing on the same location), so sweep
+        the location axis keeping the covering pieces in a heap, largest offset on top: that
+        offset gives the smallest seed reaching each segment.
+        """
+        images = sorted(
+            (start + offset, stop + offset, offset) for start, stop, offset in self.pieces
+        )
+        cuts = sorted({x for lo, hi, _ in images for x in (lo, hi)})
+
+        starts: list[int] = []
+        stops: list[int] = []
+        offsets: list[int] = []
+        active: list[tuple[int, int]] = []  # (-offset, image stop)
+        nxt = 0
+        for lo, hi in itertools.pairwise(cuts):
+            while nxt < len(images) and images[nxt][0] <= lo:
+                heapq.heappush(active, (-images[nxt][2], images[nxt][1]))
+                nxt += 1
+            while active and active[0][1] <= lo:
+                heapq.heappop(active)
+            if not active:
+                continue
+
+            offset = -active[0][0]
+            if stops and stops[-1] == lo and offsets[-1] == offset:
+                stops[-1] = hi
+            else:
+                starts.append(lo)
+                stops.append(hi)
+                offsets.append(offset)
+
+        return starts, stops, offsets
+
+    def location(self, seed: int) -> int:
+        idx = bisect.bisect_right(self.starts, seed) - 1
+        if idx >= 0 and seed < self.stops[idx]:
+            return seed + self.offsets[idx]
+        return seed
+
+    def locations(self, seeds: npt.NDArray[np.int64]) -> npt.NDArray[np.int64]:
+        """location() for a whole array of seeds: one searchsorted and a masked offset add."""
+        seeds = np.asarray(seeds, dtype=np.int64)
+        if not len(self.starts):
+            return seeds
+
+        idx = np.searchsorted(self.np_starts, seeds, side="right") - 1
+        clipped = np.maximum(idx, 0)
+        inside = (idx >= 0) & (seeds < self.np_stops[clipped])
+        return seeds + np.where(inside, self.np_offsets[clipped], 0)
+
+    def seed(self, location: int) -> int | None:
+        """The smallest seed that ends up at this location, if any."""
+        inv_starts, inv_stops, inv_offsets = self.inverse
+        offsets = []
+        idx = bisect.bisect_right(inv_starts, location) - 1
+        if idx >= 0 and location < inv_stops[idx]:
+            offsets.append(inv_offsets[idx])
+        if not 0 <= location < self.bound:
+            offsets.append(0)
+
+        return location - max(offsets) if offsets else None
+
+
+def lowest_location(seed_ranges: Disjoint, transforms: list[Table]) -> int:
+    spans = seed_ranges
+    for chunk in transforms:
+        mapped = Disjoint()
+        for lo, hi in map_ranges(list(spans), chunk):
+            mapped.update(lo, hi - lo)
+        spans = mapped
+
+    return next(iter(spans))[0]
+
+
+def part2(data: tuple[list[int], list[Table]]) -> int:
+    seeds, transforms = data
+
+    seed_ranges = Disjoint()
+    for i in range(0, len(seeds), 2):
+        seed_ranges.update(seeds[i], seeds[i+1])
+
+    return lowest_location(seed_ranges, transforms)
 
 
 # naive solution only took 19min ... that's fine, right?
-def part2(data: tuple[list[int], list[set[Interval]]]) -> int:
+# (superseded by mapping whole ranges forward in part2)
+def part2_reverse(data: tuple[list[int], list[Table]]) -> int:
     seeds, transforms = data
 
     # weirdly, my input seemed to have no overlapping seeds
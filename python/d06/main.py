@@ -7,7 +7,8 @@ import sys
 from pathlib import Path
 from pprint import pprint
 
-# import numpy as np
+import numpy as np
+import numpy.typing as npt
 
 
 def parse(fname: str, part2=False):
@@ -40,16 +41,99 @@ def good_distance(time: int, distance: int):
     return
 
 
+def winning_holds(time: int, distance: int) -> int:
+    """Count hold times t in [0, time] with t * (time - t) > distance, exactly.
+
+    The roots of t^2 - time*t + distance are (time +- sqrt(time^2 - 4*distance)) / 2. isqrt gets
+    within one of the lower root, then nudge it so `lo` is the first winning hold.
+    """
+    disc = time * time - 4 * distance
+    if disc < 0:
+        return 0
+
+    lo = max((time - math.isqrt(disc)) // 2, 0)
+    while lo <= time // 2 and lo * (time - lo) <= distance:
+        lo += 1
+    while lo > 0 and (lo - 1) * (time - lo + 1) > distance:
+        lo -= 1
+
+    if lo > time // 2:
+        return 0
+    # winning holds are symmetric around time / 2
+    return time - 2 * lo + 1
+
+
+# past this, time^2 - 4*distance is no longer exact in a float64 (or even an int64)
+EXACT_TIME = 2**26
+EXACT_DISTANCE = 2**50
+
+
+def as_int_array(values: npt.ArrayLike) -> npt.NDArray:
+    """Integers as an int array, or an object array of python ints if numpy can't hold them.
+
+    Mixing small ints with ones past int64 otherwise coerces the lot to float64 and rounds them.
+    """
+    arr = np.asarray(values)
+    if arr.dtype.kind in "iu":
+        return arr
+    return np.array(values, dtype=object)
+
+
+def winning_holds_batch(times: npt.ArrayLike, distances: npt.ArrayLike) -> npt.NDArray:
+    """winning_holds for whole arrays of races at once.
+
+    Races small enough for an exact float64 discriminant are solved with vector ops; the rest
+    fall back to the exact integer solver one by one.
+    """
+    times = as_int_array(times)
+    distances = as_int_array(distances)
+    fast = ((times <= EXACT_TIME) & (abs(distances) <= EXACT_DISTANCE)).astype(bool)
+
+    counts = np.zeros(len(times), dtype=np.int64 if fast.all() else object)
+
+    t = times[fast].astype(np.int64)
+    d = distances[fast].astype(np.int64)
+    disc = t * t - 4 * d
+    half = t // 2
+
+    lo = np.maximum((t - np.sqrt(np.maximum(disc, 0))) // 2, 0).astype(np.int64)
+    # sqrt of an exact float is off by less than one, so these only run a step or two
+    while (step := (lo <= half) & (lo * (t - lo) <= d)).any():
+        lo += step
+    while (step := (lo > 0) & ((lo - 1) * (t - lo + 1) > d)).any():
+        lo -= step
+
+    counts[fast] = np.where((disc < 0) | (lo > half), 0, t - 2 * lo + 1)
+    counts[~fast] = [
+        winning_holds(int(time), int(distance))
+        for time, distance in zip(times[~fast], distances[~fast], strict=True)
+    ]
+
+    return counts
+
+
+def part1_batch(data: list[tuple[int, int]]) -> int:
+    times, distances = zip(*data, strict=True)
+    return math.prod(winning_holds_batch(times, distances).tolist())
+
+
 def part1(data: list[tuple[int, int]]) -> int:
-    return math.prod(sum(good_distance(t, d)) for t, d in data)
+    return math.prod(winning_holds(t, d) for t, d in data)
 
 
 def part2(data: tuple[int, int]) -> int:
     time, distance = data
-    # couldn't get this to work nicely(?), but actually the naive solution isn't as slow as i feared.
-    # ~ 5.5 sec
-    # return np.roots([-1, time, -1 * distance])
-    return sum(good_distance(time, distance))
+    # couldn't get np.roots to work nicely(?), and the naive good_distance loop took ~ 5.5 sec.
+    # integer square root gives the exact count directly.
+    return winning_holds(time, distance)
+
+
+def test_batch_mixed_sizes() -> None:
+    # a plain list mixing small times with one past int64 must not be rounded through float64
+    times = [96446795, 75830747, 50285311, 17758316442234971825]
+    distances = [t * t // 5 for t in times]
+    expected = [winning_holds(t, d) for t, d in zip(times, distances, strict=True)]
+    assert winning_holds_batch(times, distances).tolist() == expected  # noqa: S101
 
 
 if __name__ == "__main__":
@@ -3,19 +3,16 @@
 from __future__ import annotations
 
 # commonly-used built-in imports. not all of these are necessarily used each day.
-import functools
 import sys
 import typing
-from collections import Counter
 from enum import Enum, auto
 from pathlib import Path
 from pprint import pprint  # noqa: F401
 
-# ace is high
-CARDS = {c: idx for idx, c in enumerate("23456789TJQKA")}
+import numpy as np
+import numpy.typing as npt
 
 
-@functools.total_ordering
 class HandType(Enum):
     five = auto()
     four = auto()
@@ -26,143 +23,187 @@ class HandType(Enum):
     high = auto()
 
     @classmethod
-    def from_line_p1(cls, s: str) -> HandType:
-        cards = Counter(Counter(s).values())
-
-        if 5 in cards:
-            return HandType.five
-        if 4 in cards:
-            return HandType.four
-        if 3 in cards and 2 in cards:
-            return HandType.full
-        if 3 in cards:
-            return HandType.three
-        if 2 in cards and cards[2] == 2:
-            return HandType.two_p
-        if 2 in cards and cards[2] == 1:
-            return HandType.one_p
-
-        return HandType.high
+    def from_line(cls, s: str, wilds: str = "") -> HandType:
+        signature = tuple(sorted((s.count(c) for c in set(s) if c not in wilds), reverse=True))
+        return CLASSIFY[signature, sum(s.count(w) for w in wilds)]
+
+    @property
+    def rank(self) -> int:
+        # members are declared strongest first: high card is 0, five of a kind is 6
+        return len(HandType) - self.value
+
+
+# without wilds: the card counts of a hand, largest first
+SIGNATURES = {
+    (5,): HandType.five,
+    (4, 1): HandType.four,
+    (3, 2): HandType.full,
+    (3, 1, 1): HandType.three,
+    (2, 2, 1): HandType.two_p,
+    (2, 1, 1, 1): HandType.one_p,
+    (1, 1, 1, 1, 1): HandType.high,
+}
+
+
+def partitions(n: int, largest: int = 5) -> typing.Generator[tuple[int, ...], None, None]:
+    """Every way to split n cards into groups, largest group first."""
+    if n == 0:
+        yield ()
+        return
+    for first in range(min(n, largest), 0, -1):
+        for rest in partitions(n - first, first):
+            yield (first, *rest)
+
+
+def _classify_table() -> dict[tuple[tuple[int, ...], int], HandType]:
+    """(signature of the non-wild cards, number of wilds) -> hand type.
+
+    Wilds always do best joining the largest group.
+    """
+    table = {}
+    for jokers in range(6):
+        for signature in partitions(5 - jokers):
+            best = (signature[0] + jokers, *signature[1:]) if signature else (5,)
+            table[signature, jokers] = SIGNATURES[best]
+    return table
+
+
+CLASSIFY = _classify_table()
+
+
+def sort_key(type_: HandType, ranks: typing.Iterable[int]) -> int:
+    """Pack a hand into one int: the type rank, then each card rank as a 4-bit digit."""
+    key = type_.rank
+    for r in ranks:
+        key = key << 4 | r
+    return key
+
+
+class Ruleset(typing.NamedTuple):
+    # card -> rank, weakest first
+    ranks: dict[str, int]
+    # cards that count as whatever makes the best hand
+    wilds: str = ""
+
+    def key(self, cards: str) -> int:
+        return sort_key(HandType.from_line(cards, self.wilds), (self.ranks[c] for c in cards))
+
+
+# ace is high
+STANDARD = Ruleset({c: idx for idx, c in enumerate("23456789TJQKA")})
+# part 2: J is wild, but the weakest card on its own
+JOKERS = Ruleset({c: idx for idx, c in enumerate("J23456789TQKA")}, wilds="J")
+
+RULESETS = (STANDARD, JOKERS)
+
 
-    @classmethod
-    def from_line(cls, s: str, part2: bool=False) -> HandType:
-        if (not part2) or "J" not in s:
-            # delegate to original if there are no wilds or if we're not in part 2.
-            return HandType.from_line_p1(s)
-
-        initial = Counter(s)
-        jokers = initial["J"]
-        del initial["J"]
-        cards = Counter(initial.values())
-
-        if jokers in (4, 5):
-            return HandType.five
-
-        if jokers == 3:
-            if 2 in cards:
-                return HandType.five
-            if 1 in cards:
-                return HandType.four
-
-        if jokers == 2:
-            if 3 in cards:
-                return HandType.five
-            if 2 in cards:  # other 1
-                return HandType.four
-            if 1 in cards:  # other 1, 1
-                return HandType.three
-
-        if jokers == 1:
-            if 4 in cards:
-                return HandType.five
-            if 3 in cards:  # other 1
-                return HandType.four
-            if 2 in cards and cards[2] == 2:
-                return HandType.full
-            if 2 in cards:  # other 1, 1
-                return HandType.three
-            if 1 in cards:  # other 1, 1, 1
-                return HandType.one_p
-
-        msg = "unreachable"
-        raise ValueError(msg)
-
-    def __le__(self, other: HandType):
-        return (self.value > other.value) or (self == other)
-
-    # annotation `other` will break liskov :/
-    def __eq__(self, other):  # noqa: ANN001
-        return self.value == other.value
-
-
-@functools.total_ordering
 class Hand(typing.NamedTuple):
-    type_: HandType
     cards: tuple[str, str, str, str, str]
     bid: int
+    # precomputed ordering under each of RULESETS, see sort_key
+    keys: tuple[int, ...]
 
     @classmethod
-    def from_line(cls, s: str, part2: bool=False) -> Hand:
+    def from_line(cls, s: str) -> Hand:
         cards, bid = s.split(" ")
 
         return Hand(
-            type_ = HandType.from_line(cards, part2),
             cards = tuple([c for c in cards]),
             bid = int(bid),
+            keys = tuple(rules.key(cards) for rules in RULESETS),
         )
 
-    # annotating `other` will break liskov :/
-    def __eq__(self, other) -> bool:  # noqa: ANN001
-        if self.type_ == other.type_:
-            return all(CARDS[c1] == CARDS[c2] for c1, c2 in zip(self.cards, other.cards))
-        return False
-
-    # annotating `other` will break liskov :/
-    def __lt__(self, other) -> bool:  # noqa: ANN001
-        if self.type_ < other.type_:
-            return True
-
-        if self.type_ > other.type_:
-            return False
-
-        for c1, c2 in zip(self.cards, other.cards):
-            if CARDS[c1] < CARDS[c2]:
-                return True
-            if CARDS[c1] > CARDS[c2]:
-                return False
-            # if they're equal, keep checking
-
-        return False
 
-
-def parse(fname: str, part2: bool=False) -> list[Hand]:
+def parse(fname: str) -> list[Hand]:
     """Read from data file. Returns problem specific formatted data."""
     with Path(fname).open() as f:
         return [
-            Hand.from_line(line.strip(), part2)
+            Hand.from_line(line.strip())
             for line in f.read().splitlines()
             if line.strip()
         ]
 
 
-def part1(data: list[Hand]) -> int:
+def winnings(data: list[Hand], rules: Ruleset) -> int:
+    if rules in RULESETS:
+        idx = RULESETS.index(rules)
+        key = lambda h: h.keys[idx]  # noqa: E731
+    else:
+        # no precomputed key for this one
+        key = lambda h: rules.key("".join(h.cards))  # noqa: E731
+
     return sum(
         hand.bid * rank
-        for rank, hand in enumerate(sorted(data), start=1)
+        for rank, hand in enumerate(sorted(data, key=key), start=1)
     )
 
 
+def part1(data: list[Hand]) -> int:
+    return winnings(data, STANDARD)
+
+
 def part2(data: list[Hand]) -> int:
-    # rank J as lowest card by mutating a global dict :vomit:
-    del CARDS["J"]
-    CARDS["J"] = -1
+    return winnings(data, JOKERS)
 
-    return sum(
-        hand.bid * rank
-        for rank, hand in enumerate(sorted(data), start=1)
+
+# columnar backend: whole tournaments as arrays, no Hand per row
+
+
+class Columns(typing.NamedTuple):
+    # (n, 5) raw card bytes
+    cards: npt.NDArray[np.uint8]
+    bids: npt.NDArray[np.int64]
+
+
+def parse_columnar(fname: str) -> Columns:
+    tokens = Path(fname).read_bytes().split()
+    return Columns(
+        cards = np.frombuffer(b"".join(tokens[::2]), dtype=np.uint8).reshape(-1, 5),
+        bids = np.array([int(b) for b in tokens[1::2]], dtype=np.int64),
     )
 
 
+def _type_table() -> npt.NDArray[np.uint8]:
+    """[largest group, second largest group] -> type rank; that pair tells every type apart."""
+    table = np.zeros((6, 6), dtype=np.uint8)
+    for signature, type_ in SIGNATURES.items():
+        table[signature[0], signature[1] if len(signature) > 1 else 0] = type_.rank
+    return table
+
+
+TYPE_RANKS = _type_table()
+
+
+def rank_matrix(data: Columns, rules: Ruleset) -> npt.NDArray[np.uint8]:
+    lookup = np.zeros(256, dtype=np.uint8)
+    for c, rank in rules.ranks.items():
+        lookup[ord(c)] = rank
+    return lookup[data.cards]
+
+
+def type_ranks(ranks: npt.NDArray[np.uint8], rules: Ruleset) -> npt.NDArray[np.uint8]:
+    # (n, 13) how many of each card every hand holds
+    counts = (ranks[:, :, None] == np.arange(len(rules.ranks))).sum(axis=1)
+
+    wild = [rules.ranks[w] for w in rules.wilds]
+    jokers = counts[:, wild].sum(axis=1)
+    counts[:, wild] = 0
+
+    # wilds always do best joining the largest group
+    top = -np.sort(-counts, axis=1)[:, :2]
+    top[:, 0] += jokers
+    return TYPE_RANKS[top[:, 0], top[:, 1]]
+
+
+def winnings_columnar(data: Columns, rules: Ruleset) -> int:
+    ranks = rank_matrix(data, rules)
+    # lexsort sorts by the last key first
+    order = np.lexsort((*ranks.T[::-1], type_ranks(ranks, rules)))
+    return int(data.bids[order] @ np.arange(1, len(order) + 1))
+
+
 if __name__ == "__main__":
-    # print(part1(parse(sys.argv[1])))
-    print(part2(parse(sys.argv[1], True)))
+    data = parse(sys.argv[1])
+
+    print(part1(data))
+    print(part2(data))